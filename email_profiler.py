@@ -1,30 +1,116 @@
 import getpass
+import hashlib
 import os
-from typing import List, Dict
+import re
+import email
+import imaplib
+import queue
+import socket
+import string
+from typing import Any, List, Dict, Optional, Iterable, Iterator, FrozenSet, Set, Union, Callable, Tuple
 import json
 import time
 import sys
 import select
+import selectors
 import tty
 import termios
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import logging
 from dataclasses import dataclass, field
+from contextlib import contextmanager
 
 from ragora.utils import (
     EmailProvider,
     EmailProviderFactory,
     IMAPCredentials,
+    IMAPProvider,
     ProviderType,
     EmailDraft,
+    EmailMessage,
 )
 
 from ragora.core import KnowledgeBaseManager, SearchStrategy, EmailPreprocessor, EmailMessageModel, EmailListResult
+from weaviate.classes.config import Configure, DataType, Property, Reconfigure
+from weaviate.classes.query import Filter
+from weaviate.util import generate_uuid5
 
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s:%(name)s:%(message)s")
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Load the .env file once; the getters below only read the environment
+load_dotenv()
+
+# Shared preprocessor used to clean incoming email bodies before searching
+_EMAIL_PREPROCESSOR = EmailPreprocessor()
+
+# imaplib has no IDLE command (RFC 2177) before Python 3.14
+imaplib.Commands.setdefault("IDLE", ("AUTH", "SELECTED"))
+
+# Matches the UID item in an untagged FETCH response line
+_FETCH_UID_PATTERN = re.compile(rb"UID (\d+)")
+
+# Matches the highest mod-sequence a CONDSTORE server appends to SEARCH results
+_SEARCH_MODSEQ_PATTERN = re.compile(rb"\(MODSEQ (\d+)\)")
+
+# Number of parallel IMAP connections used for bulk historical fetches;
+# Gmail and Yahoo allow up to 15 connections per account
+IMAP_POOL_SIZE = 3
+
+# Emails cleaned and chunked per preprocess_emails call during ingestion
+EMAIL_PREPROCESS_BATCH_SIZE = 50
+
+# Objects per Weaviate batch request and number of concurrent batch requests
+WEAVIATE_BATCH_SIZE = 100
+WEAVIATE_BATCH_CONCURRENCY = 4
+
+# Product quantization of the HNSW index; segments must divide the vector
+# dimension (384/768 for the default text2vec-transformers models)
+PQ_SEGMENTS = 96
+PQ_TRAINING_LIMIT = 100000
+
+# LaTeX documents added to the Email knowledge base
+LATEX_DOCUMENTS = ["latex_documents/vahid.tex", "latex_documents/mohamed.tex"]
+
+# Collection holding the SHA-256 of every document already ingested, so
+# restarts don't re-embed unchanged documents
+DOCUMENT_FINGERPRINT_COLLECTION = "DocumentFingerprint"
+
+# Servers may drop an IDLE session after 30 minutes, so re-issue it before that
+IMAP_IDLE_TIMEOUT = 1740
+
+# Number of UIDs fetched per window while building the database, and how many
+# fetched windows may wait in memory while earlier ones are being ingested
+EMAIL_FETCH_WINDOW = 500
+EMAIL_PREFETCH_WINDOWS = 2
+
+# UIDs per command for the header-only sender pass; headers are small
+HEADER_FETCH_BATCH_SIZE = 1000
+
+# Number of UID FETCH commands written to the socket before awaiting replies
+IMAP_PIPELINE_DEPTH = 4
+
+# Default cap on the message set of a single UID FETCH command; some servers
+# reject longer command lines with "maximum request size exceeded"
+MAX_IMAP_COMMAND_BYTES = 8192
+
+# Fields an answer pattern may reference
+ANSWER_PATTERN_FIELDS = frozenset({"sender", "context_results"})
+
+# Minimum hybrid score for a search hit to be used as answer context
+CONTEXT_SCORE_THRESHOLD = 0.5
+
+# Number of search hits used as answer context
+CONTEXT_TOP_K = 3
+
+DEFAULT_ANSWER_PATTERN = (
+    "Hello {sender}, I am the email assistant. "
+    "I have found the following information for your question: {context_results}"
+)
+
+@dataclass(slots=True)
 class EmailSummary:
     message_id: str = field(default_factory=str)
     subject: str = field(default_factory=str)
@@ -33,50 +119,657 @@ class EmailSummary:
     folder: str = field(default_factory=str)
     body: str = field(default_factory=str)
 
-    def from_dict(self, data: Dict) -> 'EmailSummary':
-        return EmailSummary(
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'EmailSummary':
+        return cls(
             message_id=data["email_id"],
             subject=data["subject"],
             sender=data["sender"],
             date_sent=data["date_sent"],
             folder=data["folder"],
-            body=data["body"] if data["body"] is not None else field(default_factory=str)
+            body=data["body"] or ""
         )
 
 
-def wait_with_quit(timeout_seconds: int) -> bool:
-    """Wait up to timeout_seconds while allowing user to press 'q' to quit.
+def _iter_fetch_literals(data: List) -> Iterator[Tuple[str, bytes]]:
+    """Yield (UID, literal) for each message in a raw UID FETCH response.
 
-    Returns True if quit was requested, False otherwise.
+    Literals come as (text before the literal, literal) tuples followed by
+    the rest of the response as bytes. Servers may send the UID item on
+    either side of the literal, so both parts are searched.
+    """
+    for index, item in enumerate(data):
+        if not isinstance(item, tuple):
+            continue
+        match = _FETCH_UID_PATTERN.search(item[0])
+        if match is None and index + 1 < len(data) and isinstance(data[index + 1], bytes):
+            match = _FETCH_UID_PATTERN.search(data[index + 1])
+        if match is None:
+            logger.warning("Skipping FETCH response without UID: %r", item[0])
+            continue
+        yield match.group(1).decode(), item[1]
+
+
+def _chunk_uids_by_cmd_length(uids: List[str], max_bytes: int = MAX_IMAP_COMMAND_BYTES) -> List[str]:
+    """Split UIDs into IMAP message sets whose length stays under max_bytes.
+
+    Consecutive UIDs are coalesced into "a:b" ranges before splitting, so a
+    contiguous mailbox fits into very few commands.
+    Args:
+        uids: The UIDs to split
+        max_bytes: Maximum length of a single message set string
+    Returns:
+        List of message set strings, e.g. ["1:20,25,30:41"]
+    """
+    sorted_uids = sorted({int(uid) for uid in uids})
+    ranges: List[List[int]] = []
+    for uid in sorted_uids:
+        if ranges and ranges[-1][1] == uid - 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+
+    message_sets = []
+    current = ""
+    for start, end in ranges:
+        token = str(start) if start == end else f"{start}:{end}"
+        if current and len(current) + len(token) + 1 > max_bytes:
+            message_sets.append(current)
+            current = ""
+        current = f"{current},{token}" if current else token
+    if current:
+        message_sets.append(current)
+    return message_sets
+
+
+class BatchedIMAPProvider(IMAPProvider):
+    """IMAP provider that fetches message bodies in UID batches.
+
+    The base provider issues one FETCH per message, so fetching a mailbox costs
+    one round-trip per email. This provider groups UIDs into a single
+    UID FETCH command per batch and pipelines several batches at once.
+    """
+
+    def __init__(self, credentials: IMAPCredentials):
+        super().__init__(credentials)
+        # Serializes command bursts so SELECT/LOGIN never interleave a pipeline
+        self._command_lock = threading.RLock()
+        # Tag of the IDLE command in progress, if any
+        self._idle_tag: Optional[str] = None
+        # Folder currently selected on the session, so polls can skip SELECT
+        self._selected_folder: Optional[str] = None
+        # Per-folder mod-sequence up to which every unseen message was fetched
+        self._highest_modseq: Dict[str, int] = {}
+        # Whether the session was opened without the SMTP login
+        self._imap_only = False
+
+    def connect(self, imap_only: bool = False) -> None:
+        """Connect and start from a fresh selection state.
+        Args:
+            imap_only: Skip the SMTP login, for sessions that only fetch or IDLE
+        """
+        if imap_only:
+            self._connect_imap()
+        else:
+            super().connect()
+        self._imap_only = imap_only
+        self._reset_selection()
+
+    def _connect_imap(self) -> None:
+        """Open and log into the IMAP session only, like IMAPProvider.connect does."""
+        credentials = self.credentials
+        try:
+            client: Any
+            if credentials.use_ssl:
+                client = imaplib.IMAP4_SSL(credentials.imap_server, credentials.imap_port)
+            else:
+                client = imaplib.IMAP4(credentials.imap_server, credentials.imap_port)
+                if credentials.use_tls:
+                    client.starttls()
+            client.login(credentials.username, credentials.password)
+            self._imap_client = client
+            self._connected = True
+        except Exception as e:
+            self._connected = False
+            raise ConnectionError(f"Failed to connect to IMAP server: {str(e)}")
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if connected; IMAP-only sessions have no SMTP client."""
+        if self._imap_only:
+            return self._connected and self._imap_client is not None
+        return super().is_connected
+
+    def disconnect(self) -> None:
+        """Disconnect and forget the selection state of the old session.
+
+        IMAPProvider.disconnect starts with CLOSE, which imaplib refuses
+        unless a folder is selected, and then skips LOGOUT; so sessions that
+        never selected a folder are logged out here.
+        """
+        if self._imap_client is not None and self._selected_folder is None:
+            try:
+                self._imap_client.logout()
+            except Exception:
+                # Ignore errors during disconnect, like IMAPProvider does
+                pass
+            self._imap_client = None
+        super().disconnect()
+        self._reset_selection()
+
+    def _reset_selection(self) -> None:
+        self._selected_folder = None
+        self._highest_modseq.clear()
+
+    def select_folder(self, folder: Optional[str] = None) -> None:
+        """Select the folder that subsequent UID commands operate on.
+
+        SELECT is skipped when the folder is already selected on this session.
+        Args:
+            folder: The folder to select (None for INBOX)
+        """
+        if not self.is_connected:
+            raise ConnectionError("Not connected to IMAP server")
+
+        folder_name = folder or "INBOX"
+        with self._command_lock:
+            if self._selected_folder == folder_name:
+                return
+            status, data = self._imap_client.select(folder_name)
+            if status != "OK":
+                self._selected_folder = None
+                raise RuntimeError(f"Failed to select folder {folder_name}: {data}")
+            self._selected_folder = folder_name
+
+    def fetch_messages(
+        self,
+        limit: Optional[int] = None,
+        folder: Optional[str] = None,
+        unread_only: bool = False,
+    ) -> List[EmailMessage]:
+        """Fetch messages over the persistent session without re-selecting the folder.
+
+        Messages are fetched with BODY[] like the base provider's RFC822 fetch,
+        so they are marked as seen. On CONDSTORE servers an unread poll only
+        searches messages changed since the previous poll.
+        Args:
+            limit: The maximum number of messages to fetch
+            folder: The folder to search for messages
+            unread_only: Whether to only fetch unread messages
+        Returns:
+            List of EmailMessage objects
+        """
+        if not self.is_connected:
+            raise ConnectionError("Not connected to IMAP server")
+
+        try:
+            with self._command_lock:
+                if unread_only:
+                    uids = self._search_unseen_uids(folder, limit)
+                else:
+                    uids = self.search_uids(folder)
+                uids = uids[-limit:] if limit is not None and limit > 0 else uids
+                email_messages = []
+                for data in self._iter_fetch_responses(
+                    uids, "(UID BODY[] FLAGS)", 100, MAX_IMAP_COMMAND_BYTES, IMAP_PIPELINE_DEPTH
+                ):
+                    email_messages.extend(self._parse_fetch_response(data))
+            return email_messages
+        except Exception as e:
+            raise RuntimeError(f"Failed to fetch messages: {str(e)}")
+
+    def _search_unseen_uids(self, folder: Optional[str], limit: Optional[int]) -> List[str]:
+        """Return the UIDs of unseen messages, restricted by MODSEQ when the server supports CONDSTORE.
+
+        The stored mod-sequence only advances when a poll returned every unseen
+        message; otherwise messages left over by the limit would never match again.
+        """
+        client = self._imap_client
+        folder_name = folder or "INBOX"
+        self.select_folder(folder_name)
+        if "CONDSTORE" not in client.capabilities:
+            status, data = client.uid("search", None, "UNSEEN")
+            if status != "OK":
+                raise RuntimeError("Failed to search messages")
+            return [uid.decode() for uid in data[0].split()]
+
+        # A MODSEQ criterion also enables CONDSTORE on the session (RFC 7162)
+        last_modseq = self._highest_modseq.get(folder_name, 0)
+        status, data = client.uid("search", None, "UNSEEN", "MODSEQ", str(last_modseq + 1))
+        if status != "OK":
+            raise RuntimeError("Failed to search messages")
+        match = _SEARCH_MODSEQ_PATTERN.search(data[0])
+        uids = [uid.decode() for uid in _SEARCH_MODSEQ_PATTERN.sub(b"", data[0]).split()]
+        if limit is not None and 0 < limit < len(uids):
+            self._highest_modseq.pop(folder_name, None)
+        elif match is not None:
+            self._highest_modseq[folder_name] = max(last_modseq, int(match.group(1)))
+        return uids
+
+    def create_draft(self, *args, **kwargs) -> EmailDraft:
+        """Create a draft; the base provider selects the drafts folder directly."""
+        try:
+            return super().create_draft(*args, **kwargs)
+        finally:
+            self._selected_folder = None
+
+    def send_message(self, *args, **kwargs) -> bool:
+        """Send a draft; the base provider selects the drafts folder directly."""
+        try:
+            return super().send_message(*args, **kwargs)
+        finally:
+            self._selected_folder = None
+
+    def search_uids(self, folder: Optional[str] = None, unread_only: bool = False) -> List[str]:
+        """Select a folder and return the UIDs of its messages.
+        Args:
+            folder: The folder to search (None for INBOX)
+            unread_only: Whether to only return unread messages
+        Returns:
+            List of UIDs as strings
+        """
+        if not self.is_connected:
+            raise ConnectionError("Not connected to IMAP server")
+
+        with self._command_lock:
+            self.select_folder(folder)
+            status, data = self._imap_client.uid("search", None, "UNSEEN" if unread_only else "ALL")
+        if status != "OK":
+            raise RuntimeError("Failed to search messages")
+        return [uid.decode() for uid in data[0].split()]
+
+    def fetch_bodies(
+        self,
+        uids: List[str],
+        batch_size: int = 100,
+        max_command_bytes: int = MAX_IMAP_COMMAND_BYTES,
+        pipeline_depth: int = IMAP_PIPELINE_DEPTH,
+    ) -> List[EmailMessage]:
+        """Fetch full messages for the given UIDs of the selected folder.
+        Args:
+            uids: The UIDs of the messages to fetch
+            batch_size: Maximum number of UIDs per UID FETCH command
+            max_command_bytes: Maximum length of the message set per command
+            pipeline_depth: Number of UID FETCH commands in flight at once
+        Returns:
+            List of EmailMessage objects, as the email preprocessor expects them
+        """
+        if not self.is_connected:
+            raise ConnectionError("Not connected to IMAP server")
+
+        email_messages = []
+        for data in self._iter_fetch_responses(
+            uids, "(UID BODY.PEEK[] FLAGS INTERNALDATE)", batch_size, max_command_bytes, pipeline_depth
+        ):
+            email_messages.extend(self._parse_fetch_response(data))
+        return email_messages
+
+    def mark_seen(self, uids: List[str], max_command_bytes: int = MAX_IMAP_COMMAND_BYTES) -> None:
+        """Flag the given UIDs of the selected folder as \\Seen.
+        Args:
+            uids: The UIDs of the messages to flag
+            max_command_bytes: Maximum length of the message set per command
+        """
+        if not self.is_connected:
+            raise ConnectionError("Not connected to IMAP server")
+
+        with self._command_lock:
+            for message_set in _chunk_uids_by_cmd_length(uids, max_command_bytes):
+                status, data = self._imap_client.uid("STORE", message_set, "+FLAGS.SILENT", "(\\Seen)")
+                if status != "OK":
+                    raise RuntimeError(f"Failed to mark messages as seen: {data}")
+
+    def fetch_senders_only(
+        self,
+        uids: List[str],
+        batch_size: int = HEADER_FETCH_BATCH_SIZE,
+        max_command_bytes: int = MAX_IMAP_COMMAND_BYTES,
+        pipeline_depth: int = IMAP_PIPELINE_DEPTH,
+    ) -> Dict[str, str]:
+        """Fetch only the From header for the given UIDs of the selected folder.
+
+        This lets callers filter by sender before downloading any bodies.
+        Args:
+            uids: The UIDs of the messages to inspect
+            batch_size: Maximum number of UIDs per UID FETCH command
+            max_command_bytes: Maximum length of the message set per command
+            pipeline_depth: Number of UID FETCH commands in flight at once
+        Returns:
+            Dict mapping each UID to its sender email address
+        """
+        if not self.is_connected:
+            raise ConnectionError("Not connected to IMAP server")
+
+        senders = {}
+        for data in self._iter_fetch_responses(
+            uids, "(UID BODY.PEEK[HEADER.FIELDS (FROM)])", batch_size, max_command_bytes, pipeline_depth
+        ):
+            for uid, literal in _iter_fetch_literals(data):
+                try:
+                    header = email.message_from_bytes(literal)
+                    # Parse like the base provider does so both passes agree on the sender
+                    sender = self._parse_address(header.get("From", ""))
+                except Exception as e:
+                    logger.warning("Skipping sender of message with UID %s: %s", uid, e)
+                    continue
+                senders[uid] = sender.email
+        return senders
+
+    def _iter_fetch_responses(
+        self,
+        uids: List[str],
+        fetch_items: str,
+        batch_size: int,
+        max_command_bytes: int,
+        pipeline_depth: int,
+    ) -> Iterator[List]:
+        """Yield the raw FETCH responses for the UIDs, one pipelined burst at a time."""
+        message_sets = []
+        for i in range(0, len(uids), batch_size):
+            message_sets.extend(_chunk_uids_by_cmd_length(uids[i:i + batch_size], max_command_bytes))
+
+        for i in range(0, len(message_sets), pipeline_depth):
+            yield self._pipelined_uid_fetch(message_sets[i:i + pipeline_depth], fetch_items)
+
+    def _pipelined_uid_fetch(self, message_sets: List[str], fetch_items: str) -> List:
+        """Send several UID FETCH commands before reading any of their replies.
+
+        All tags are written to the socket first, then the tagged completions
+        are collected in order. The untagged FETCH responses of every command
+        carry their UID, so they are demultiplexed by UID during parsing.
+        Args:
+            message_sets: One message set per UID FETCH command
+            fetch_items: The FETCH data items, e.g. "(UID BODY.PEEK[])"
+        Returns:
+            The raw untagged FETCH responses of all commands
+        """
+        client = self._imap_client
+        with self._command_lock:
+            tags = [client._command("UID", "FETCH", message_set, fetch_items) for message_set in message_sets]
+            failed = []
+            for tag, message_set in zip(tags, message_sets):
+                status, data = client._command_complete("UID", tag)
+                if status != "OK":
+                    failed.append((message_set, data))
+            responses = client.untagged_responses.pop("FETCH", [])
+        if failed:
+            raise RuntimeError(f"Failed to fetch messages: {failed}")
+        return responses
+
+    def fileno(self) -> int:
+        """Return the IMAP socket's file descriptor so the provider can be registered with a selector."""
+        if not self.is_connected:
+            raise ConnectionError("Not connected to IMAP server")
+        return self._imap_client.sock.fileno()
+
+    def idle_start(self) -> bool:
+        """Send IDLE and wait for the server's continuation response.
+
+        The server may send pending untagged responses before the
+        continuation, so those are read first.
+        Returns True if new mail was announced before IDLE was accepted.
+        """
+        if not self.is_connected:
+            raise ConnectionError("Not connected to IMAP server")
+
+        client = self._imap_client
+        new_mail = False
+        with self._command_lock:
+            self._idle_tag = tag = client._command("IDLE")
+            while True:
+                response = client._get_response()
+                if response is None:
+                    break
+                if client.tagged_commands.get(tag):
+                    # IDLE was completed (e.g. rejected); there is nothing to end
+                    self._idle_tag = None
+                    raise RuntimeError(f"Unexpected IDLE response: {response}")
+                new_mail = new_mail or response.endswith((b"EXISTS", b"RECENT"))
+        return new_mail
+
+    def idle_pending(self) -> bool:
+        """Whether IDLE responses are already buffered where select can't see them.
+
+        idle_start reads the continuation through imaplib's buffered file, so
+        lines sent in the same packet sit in that buffer; TLS may also hold
+        decrypted bytes the socket no longer reports as readable.
+        """
+        client = self._imap_client
+        pending = getattr(client.sock, "pending", None)
+        if pending is not None and pending() > 0:
+            return True
+        client.sock.setblocking(False)
+        try:
+            return bool(client.file.peek(1))
+        except OSError:
+            return False
+        finally:
+            client.sock.setblocking(True)
+
+    def idle_check(self, timeout: float = 0.0) -> List[bytes]:
+        """Return the untagged lines the server sent during IDLE within timeout."""
+        client = self._imap_client
+        lines: List[bytes] = []
+        if not self.idle_pending():
+            readable, _, _ = select.select([client.sock], [], [], timeout)
+            if not readable:
+                return lines
+        # Drain every complete line that is already available without blocking
+        client.sock.setblocking(False)
+        try:
+            while True:
+                try:
+                    lines.append(client._get_line())
+                except imaplib.IMAP4.abort:
+                    # A non-blocking read with no data left looks like EOF; only
+                    # a readable socket that yields nothing at all is closed
+                    if not lines:
+                        raise
+                    break
+                except (socket.timeout, OSError):
+                    break
+        finally:
+            client.sock.setblocking(True)
+        return lines
+
+    def idle_done(self) -> None:
+        """Send DONE and wait for the IDLE command to complete."""
+        client = self._imap_client
+        with self._command_lock:
+            client.send(b"DONE\r\n")
+            client._command_complete("IDLE", self._idle_tag)
+            self._idle_tag = None
+
+    def idle_end(self) -> None:
+        """End IDLE, reconnecting the session if DONE can't be completed.
+
+        Otherwise a session left in IDLE would receive the next command as
+        part of the open IDLE. Does nothing if no IDLE is open.
+        """
+        if self._idle_tag is None:
+            return
+        try:
+            self.idle_done()
+        except Exception as e:
+            logger.warning("Could not end IMAP IDLE, reconnecting: %s", e)
+            folder = self._selected_folder
+            self._idle_tag = None
+            self.disconnect()
+            self.connect(imap_only=self._imap_only)
+            self.select_folder(folder)
+
+    def _parse_fetch_response(self, data: List) -> List[EmailMessage]:
+        """Parse the response of a UID FETCH command into messages.
+        Args:
+            data: The raw response data returned by imaplib
+        Returns:
+            List of EmailMessage objects
+        """
+        email_messages = []
+        for uid, literal in _iter_fetch_literals(data):
+            try:
+                email_msg = self._parse_email_message(email.message_from_bytes(literal), uid)
+            except Exception as e:
+                logger.warning("Skipping message with UID %s: %s", uid, e)
+                continue
+            email_msg.metadata["uid"] = uid
+            # Only the body is indexed; don't keep attachment payloads in memory
+            for attachment in email_msg.attachments:
+                attachment.content = None
+            email_messages.append(email_msg)
+        return email_messages
+
+
+class EmailProviderPool:
+    """A fixed set of independently connected BatchedIMAPProviders.
+
+    Each provider holds its own IMAP session, so UID shards can be fetched in
+    parallel threads; imaplib releases the GIL while waiting on the socket.
+    """
+
+    def __init__(self, credentials: IMAPCredentials, size: int = IMAP_POOL_SIZE):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.providers = [BatchedIMAPProvider(credentials) for _ in range(size)]
+
+    def connect(self) -> None:
+        """Connect every provider in the pool; fetch sessions don't need SMTP."""
+        for provider in self.providers:
+            provider.connect(imap_only=True)
+
+    def disconnect(self) -> None:
+        """Disconnect every provider in the pool."""
+        for provider in self.providers:
+            provider.disconnect()
+
+    def fetch_bodies(
+        self,
+        uids: List[str],
+        folder: Optional[str] = None,
+        **fetch_kwargs,
+    ) -> List[EmailMessage]:
+        """Fetch messages by UID, sharding the UIDs across the pool.
+        Args:
+            uids: The UIDs of the messages to fetch
+            folder: The folder the UIDs belong to (None for INBOX)
+            fetch_kwargs: Passed through to BatchedIMAPProvider.fetch_bodies
+        Returns:
+            List of EmailMessage objects in shard order
+        """
+        # Contiguous shards keep UID ranges coalescable in each command
+        shard_size = -(-len(uids) // len(self.providers)) if uids else 0
+        shards = [uids[i:i + shard_size] for i in range(0, len(uids), shard_size)] if uids else []
+
+        def fetch_shard(provider: BatchedIMAPProvider, shard: List[str]) -> List[EmailMessage]:
+            provider.select_folder(folder)
+            return provider.fetch_bodies(shard, **fetch_kwargs)
+
+        with ThreadPoolExecutor(max_workers=len(self.providers)) as executor:
+            futures = [
+                executor.submit(fetch_shard, provider, shard)
+                for provider, shard in zip(self.providers, shards)
+            ]
+            email_messages = []
+            for future in futures:
+                email_messages.extend(future.result())
+        return email_messages
+
+
+@contextmanager
+def cbreak_stdin():
+    """Put a TTY stdin into cbreak mode for the duration of the block.
+
+    Single key presses can then be read without Enter. Does nothing if stdin
+    is not a TTY (e.g., running as a service).
     """
-    # If stdin is not a TTY (e.g., running as a service), fall back to sleep
     if not sys.stdin.isatty():
-        time.sleep(timeout_seconds)
-        return False
+        yield
+        return
 
     fd = sys.stdin.fileno()
     old_settings = termios.tcgetattr(fd)
     try:
-        # Put terminal into cbreak mode to read single characters without Enter
         tty.setcbreak(fd)
-        end_time = time.time() + timeout_seconds
-        print("Press 'q' to quit, waiting...")
-        while time.time() < end_time:
-            rlist, _, _ = select.select([sys.stdin], [], [], 0.5)
-            if rlist:
-                ch = sys.stdin.read(1)
-                if ch.lower() == 'q':
-                    return True
-            # Small sleep granularity handled by select timeout
-        return False
+        yield
     finally:
         termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
 
 
+def wait_with_quit(timeout_seconds: int, idle_provider: Optional[BatchedIMAPProvider] = None) -> bool:
+    """Wait up to timeout_seconds while allowing user to press 'q' to quit.
+
+    stdin and, if given, an IDLE session on idle_provider are watched with a
+    single selector, so both a key press and a new-mail push from the server
+    end the wait immediately. Expects stdin to be in cbreak mode already
+    (see cbreak_stdin).
+    Returns True if quit was requested, False otherwise.
+    """
+    with selectors.DefaultSelector() as selector:
+        if sys.stdin.isatty():
+            selector.register(sys.stdin, selectors.EVENT_READ, "stdin")
+            print("Press 'q' to quit, waiting...")
+        if idle_provider is not None:
+            try:
+                if idle_provider.idle_start():
+                    # New mail arrived before the server accepted IDLE
+                    end_idle(idle_provider)
+                    return False
+                selector.register(idle_provider, selectors.EVENT_READ, "imap")
+                # Re-issue IDLE before the server drops the session
+                timeout_seconds = min(timeout_seconds, IMAP_IDLE_TIMEOUT)
+            except Exception as e:
+                logger.warning("IMAP IDLE unavailable, polling instead: %s", e)
+                end_idle(idle_provider)
+                idle_provider = None
+
+        if not selector.get_map():
+            time.sleep(timeout_seconds)
+            return False
+
+        try:
+            end_time = time.time() + timeout_seconds
+            while time.time() < end_time:
+                if not selector.get_map():
+                    time.sleep(max(0.0, end_time - time.time()))
+                    break
+                # select can't see lines imaplib or TLS already buffered
+                if idle_provider is not None and idle_provider.idle_pending():
+                    ready = ["imap"]
+                else:
+                    ready = [key.data for key, _ in selector.select(timeout=end_time - time.time())]
+                for source in ready:
+                    if source == "stdin":
+                        if sys.stdin.read(1).lower() == 'q':
+                            return True
+                        continue
+                    if idle_provider is None:
+                        continue
+                    try:
+                        lines = idle_provider.idle_check()
+                    except Exception as e:
+                        logger.warning("IMAP IDLE session lost, polling instead: %s", e)
+                        selector.unregister(idle_provider)
+                        end_idle(idle_provider)
+                        idle_provider = None
+                        continue
+                    if any(line.endswith((b"EXISTS", b"RECENT")) for line in lines):
+                        return False
+            return False
+        finally:
+            if idle_provider is not None:
+                end_idle(idle_provider)
+
+
+def end_idle(idle_provider: BatchedIMAPProvider) -> None:
+    """End an IDLE session, logging instead of raising if that fails."""
+    try:
+        idle_provider.idle_end()
+    except Exception as e:
+        logger.warning("Error ending IMAP IDLE: %s", e)
+
+
 def get_user_credentials_from_file():
     """Get email credentials from a .env file."""
-    # load the .env file
-    load_dotenv()
     # get the email, password and recipient from the .env file
     email = os.getenv("EMAIL")
     password = os.getenv("PASSWORD")
@@ -86,8 +779,6 @@ def get_user_credentials_from_file():
 
 def get_weaviate_url_from_file():
     """Get Weaviate URL from a .env file."""
-    # load the .env file
-    load_dotenv()
     # get the weaviate_url from the .env file
     weaviate_url = os.getenv("WEAVIATE_URL")
     return weaviate_url
@@ -186,12 +877,183 @@ def example_email_database_creation():
         print("\nDisconnected from email servers")
 
 
+def store_chunks_batched(
+    kbm: KnowledgeBaseManager,
+    chunks: Iterable,
+    collection: str = "Email",
+    batch_size: int = WEAVIATE_BATCH_SIZE,
+    concurrent_requests: int = WEAVIATE_BATCH_CONCURRENCY,
+) -> Tuple[List[str], Set[str]]:
+    """Store chunks through Weaviate's batch API.
+
+    kbm.vector_store.store_chunks inserts one object per request; this sends
+    batch_size objects per request with several requests in flight. Chunks
+    may be a generator; each one is added to the batch as soon as it arrives.
+    Returns the UUIDs of the chunks that were stored and the email IDs of the
+    chunks that Weaviate rejected.
+    """
+    try:
+        kbm.vector_store.create_schema(collection)
+        weaviate_collection = kbm.db_manager.get_collection(collection)
+
+        chunk_keys = []
+        chunk_email_ids = []
+        with weaviate_collection.batch.fixed_size(
+            batch_size=batch_size, concurrent_requests=concurrent_requests
+        ) as batch:
+            for chunk in chunks:
+                if chunk is None or not chunk.text or not chunk.text.strip():
+                    continue
+                object_data = kbm.vector_store.prepare_data_object(chunk)
+                batch.add_object(properties=object_data, uuid=object_data["chunk_key"])
+                chunk_keys.append(object_data["chunk_key"])
+                chunk_email_ids.append(object_data["email_id"])
+
+        if not chunk_keys:
+            logger.info("No valid chunks to store")
+            return [], set()
+        failed_uuids = {str(failed.object_.uuid) for failed in weaviate_collection.batch.failed_objects}
+        if failed_uuids:
+            logger.warning("Failed to store %d of %d chunks", len(failed_uuids), len(chunk_keys))
+        stored_keys = [key for key in chunk_keys if str(key) not in failed_uuids]
+        failed_email_ids = {
+            email_id for key, email_id in zip(chunk_keys, chunk_email_ids) if str(key) in failed_uuids
+        }
+        return stored_keys, failed_email_ids
+    except Exception as e:
+        logger.error("Error storing chunks: %s", e)
+        raise e
+
+
+def iter_email_chunks(
+    kbm: KnowledgeBaseManager,
+    emails: List[EmailMessage],
+    batch_size: int = EMAIL_PREPROCESS_BATCH_SIZE,
+) -> Iterator:
+    """Clean and chunk emails one micro-batch at a time, yielding chunks as they are ready.
+
+    Preprocessing is pure-Python regex and HTML work that holds the GIL, so
+    it runs on the calling thread; the micro-batches only bound how many
+    chunks are held before they reach the Weaviate batch.
+    """
+    for i in range(0, len(emails), batch_size):
+        yield from kbm.email_preprocessor.preprocess_emails(emails[i:i + batch_size])
+
+
+def normalize_address_list(addresses: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+    """Lowercase a list of email addresses into a frozenset for O(1) lookups."""
+    if addresses is None:
+        return None
+    return frozenset(address.lower() for address in addresses)
+
+
+def compile_answer_pattern(answer_pattern: str) -> Callable[[Dict], str]:
+    """Validate an answer pattern once and return a callable that renders it.
+    Args:
+        answer_pattern: A str.format template using the ANSWER_PATTERN_FIELDS
+    Returns:
+        A function taking a dict of the fields and returning the answer
+    """
+    for _, field_name, _, _ in string.Formatter().parse(answer_pattern):
+        if field_name is None:
+            continue
+        root = re.split(r"[.\[]", field_name, maxsplit=1)[0]
+        if root not in ANSWER_PATTERN_FIELDS:
+            raise ValueError(f"Unknown field '{field_name}' in answer pattern: {answer_pattern}")
+    return answer_pattern.format_map
+
+
+_DEFAULT_ANSWER_TEMPLATE = compile_answer_pattern(DEFAULT_ANSWER_PATTERN)
+
+
+def filter_emails_by_sender(
+    emails: List[EmailMessageModel],
+    whitelist: Optional[Iterable[str]] = None,
+    blacklist: Optional[Iterable[str]] = None,
+) -> List[EmailMessageModel]:
+    """Keep the emails whose sender passes the whitelist or blacklist."""
+    whitelist = normalize_address_list(whitelist)
+    blacklist = normalize_address_list(blacklist)
+    if whitelist is not None:
+        return [email_msg for email_msg in emails if email_msg.sender.email.lower() in whitelist]
+    elif blacklist is not None:
+        return [email_msg for email_msg in emails if email_msg.sender.email.lower() not in blacklist]
+    return emails
+
+
+def iter_email_batches(
+    fetcher: Union[BatchedIMAPProvider, EmailProviderPool],
+    uids: List[str],
+    window_size: int = EMAIL_FETCH_WINDOW,
+    prefetch: int = EMAIL_PREFETCH_WINDOWS,
+) -> Iterator[List[EmailMessage]]:
+    """Yield fetched emails one UID window at a time.
+
+    Windows are downloaded by a background thread into a bounded queue, so
+    fetching runs ahead of the consumer by at most `prefetch` windows and
+    peak memory is bounded by the window size rather than the mailbox size.
+    """
+    batches: "queue.Queue" = queue.Queue(maxsize=prefetch)
+    stop_event = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        # Give up once the consumer has stopped iterating
+        while not stop_event.is_set():
+            try:
+                batches.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for i in range(0, len(uids), window_size):
+                if not put(fetcher.fetch_bodies(uids[i:i + window_size])):
+                    return
+        except Exception as e:
+            put(e)
+            return
+        put(done)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = batches.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop_event.set()
+        producer.join()
+
+
+def filter_uids_by_sender(
+    senders: Dict[str, str],
+    whitelist: Optional[Iterable[str]] = None,
+    blacklist: Optional[Iterable[str]] = None,
+) -> List[str]:
+    """Keep the UIDs whose sender passes the whitelist or blacklist."""
+    whitelist = normalize_address_list(whitelist)
+    blacklist = normalize_address_list(blacklist)
+    if whitelist is not None:
+        return [uid for uid, sender in senders.items() if sender.lower() in whitelist]
+    elif blacklist is not None:
+        return [uid for uid, sender in senders.items() if sender.lower() not in blacklist]
+    return list(senders)
+
+
 def email_database_creation(
-    emailProfile: EmailProvider, 
+    emailProfile: BatchedIMAPProvider, 
     kbm: KnowledgeBaseManager, 
-    whitelist: List[str] = None, 
-    blacklist: List[str] = None, 
-    collection: str = "Email"
+    whitelist: Optional[FrozenSet[str]] = None, 
+    blacklist: Optional[FrozenSet[str]] = None, 
+    collection: str = "Email",
+    pool_size: int = IMAP_POOL_SIZE,
 ) -> None:
     """This function is used to create an email database using the KnowledgeBaseManager."""
 
@@ -202,31 +1064,48 @@ def email_database_creation(
         emailProfile.connect()
         logger.info("Connected to email servers")
 
-        # Fetch emails
-        emails = emailProfile.fetch_messages(
-            limit=None, folder=None, unread_only=False
-        )
-
-        filtered_email_ids = []
-        if whitelist is None and blacklist is None:
-            filtered_email_ids = [email_msg.message_id for email_msg in emails]
-        elif whitelist is not None:
-            filtered_email_ids = [email_msg.message_id for email_msg in emails if email_msg.sender.email in whitelist]
-        else: # only blacklist is not None
-            filtered_email_ids = [email_msg.message_id for email_msg in emails if email_msg.sender.email not in blacklist]
-
-        stored_ids = kbm.process_new_emails(
-            email_provider=emailProfile, 
-            email_ids=filtered_email_ids, 
-            collection=collection
-        )
+        # Filter on the From header first so only kept emails are downloaded in full
+        uids = emailProfile.search_uids(folder=None, unread_only=False)
+        if whitelist is not None or blacklist is not None:
+            senders = emailProfile.fetch_senders_only(uids)
+            uids = filter_uids_by_sender(senders, whitelist, blacklist)
+            logger.info("Keeping %d of %d emails after sender filtering", len(uids), len(senders))
+
+        # Fetch emails in UID batches, sharded over parallel connections
+        pool = None
+        fetcher: Union[BatchedIMAPProvider, EmailProviderPool] = emailProfile
+        stored_ids = []
+        try:
+            if pool_size > 1:
+                pool = EmailProviderPool(emailProfile.credentials, size=pool_size)
+                # Inside the try so sessions opened before a failed one are closed
+                pool.connect()
+                fetcher = pool
+            # Stream fetch -> clean/chunk -> batch write per window; IMAP windows
+            # are fetched while earlier ones are being chunked and stored
+            for emails in iter_email_batches(fetcher, uids):
+                stored_keys, failed_email_ids = store_chunks_batched(
+                    kbm, iter_email_chunks(kbm, emails), collection=collection
+                )
+                stored_ids.extend(stored_keys)
+                # Stored mail is history, not new mail to answer: flag it read
+                # like the base provider's RFC822 fetch did. Mail with rejected
+                # chunks stays unread so it isn't silently dropped
+                emailProfile.mark_seen([
+                    email_msg.metadata["uid"]
+                    for email_msg in emails
+                    if (email_msg.message_id or "") not in failed_email_ids
+                ])
+        finally:
+            if pool is not None:
+                pool.disconnect()
 
         # Disconnect from email servers
         emailProfile.disconnect()      
-        logger.info(f"Stored {len(stored_ids)} email chunks in knowledge base")
+        logger.info("Stored %d email chunks in knowledge base", len(stored_ids))
 
     except Exception as e:
-        logger.error(f"Error processing emails: {e}")
+        logger.error("Error processing emails: %s", e)
         raise e
 
 
@@ -317,7 +1196,7 @@ def example_email_answer_drafting_workflow():
         traceback.print_exc()
 
 
-def initialize_email_profile():
+def initialize_email_profile() -> BatchedIMAPProvider:
     """Initialize email profile."""
     try:
         email, password, recipient = get_user_credentials()
@@ -331,12 +1210,121 @@ def initialize_email_profile():
             use_ssl=True,
             use_tls=False,
         )
-        return EmailProviderFactory.create_provider(ProviderType.IMAP, credentials)
+        return BatchedIMAPProvider(credentials)
     except Exception as e:
         logger.error(f"Error initializing email profile: {e}")
         raise e
 
-def initialize_knowledge_base_manager():
+def enable_vector_quantization(kbm: KnowledgeBaseManager, collection: str = "Email") -> None:
+    """Compress the collection's HNSW vectors with product quantization.
+
+    ragora creates collections with an uncompressed HNSW index, so PQ is
+    switched on afterwards; re-applying the same settings is a no-op. A
+    rejected reconfiguration is logged and the index stays uncompressed.
+    """
+    try:
+        if not kbm.db_manager.collection_exists(collection):
+            logger.info("Collection %s does not exist, skipping vector quantization", collection)
+            return
+        kbm.db_manager.get_collection(collection).config.update(
+            vector_index_config=Reconfigure.VectorIndex.hnsw(
+                quantizer=Reconfigure.VectorIndex.Quantizer.pq(
+                    segments=PQ_SEGMENTS,
+                    training_limit=PQ_TRAINING_LIMIT,
+                )
+            )
+        )
+        logger.info("Product quantization enabled for collection %s", collection)
+    except Exception as e:
+        logger.error("Error enabling vector quantization for collection %s: %s", collection, e)
+
+
+def file_sha256(path: str) -> str:
+    """Return the hex SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_fingerprint_collection(kbm: KnowledgeBaseManager):
+    """Return the document fingerprint collection, creating it if needed."""
+    if not kbm.db_manager.collection_exists(DOCUMENT_FINGERPRINT_COLLECTION):
+        kbm.db_manager.create_collection(
+            name=DOCUMENT_FINGERPRINT_COLLECTION,
+            description="SHA-256 of the documents ingested into each collection",
+            vectorizer_config=Configure.Vectorizer.none(),
+            properties=[
+                Property(name="collection", data_type=DataType.TEXT),
+                Property(name="source_document", data_type=DataType.TEXT),
+                Property(name="sha256", data_type=DataType.TEXT),
+            ],
+        )
+    return kbm.db_manager.get_collection(DOCUMENT_FINGERPRINT_COLLECTION)
+
+
+def clear_document_fingerprints(kbm: KnowledgeBaseManager, collection: str) -> None:
+    """Forget the fingerprints of a collection, e.g. after it was (re)created."""
+    if kbm.db_manager.collection_exists(DOCUMENT_FINGERPRINT_COLLECTION):
+        kbm.db_manager.get_collection(DOCUMENT_FINGERPRINT_COLLECTION).data.delete_many(
+            where=Filter.by_property("collection").equal(collection)
+        )
+
+
+def process_document_if_changed(
+    kbm: KnowledgeBaseManager,
+    document_path: str,
+    collection: str = "Email",
+    document_type: str = "latex",
+) -> bool:
+    """Process a document unless the same content was already ingested into the collection.
+
+    Chunk IDs are deterministic and ragora skips IDs that already exist, so
+    the chunks of an earlier version are deleted before re-processing.
+    Args:
+        kbm: The knowledge base manager
+        document_path: Path to the document file
+        collection: Collection the document is stored in
+        document_type: Type of document to process
+    Returns:
+        True if the document was stored, False if it was unchanged or produced no chunks
+    """
+    try:
+        fingerprints = get_fingerprint_collection(kbm)
+        fingerprint_id = generate_uuid5(f"{collection}:{document_path}")
+        sha256 = file_sha256(document_path)
+        stored = fingerprints.query.fetch_object_by_id(fingerprint_id)
+        if stored is not None and stored.properties.get("sha256") == sha256:
+            logger.info("Document %s is unchanged, skipping", document_path)
+            return False
+
+        if kbm.db_manager.collection_exists(collection):
+            kbm.db_manager.get_collection(collection).data.delete_many(
+                where=Filter.by_property("source_document").equal(document_path)
+            )
+        # The shared LaTeX parser keeps the first document's path as the source
+        # of every later document; reset it so chunks are attributed correctly
+        latex_parser = getattr(kbm.document_preprocessor, "latex_parser", None)
+        if latex_parser is not None:
+            latex_parser.document_path = None
+        stored_ids = kbm.process_document(document_path, document_type=document_type, collection=collection)
+        if not stored_ids:
+            # Leave the old fingerprint so the document is retried on the next start
+            logger.warning("No chunks stored for document %s", document_path)
+            return False
+        properties = {"collection": collection, "source_document": document_path, "sha256": sha256}
+        if stored is None:
+            fingerprints.data.insert(properties=properties, uuid=fingerprint_id)
+        else:
+            fingerprints.data.replace(uuid=fingerprint_id, properties=properties)
+        return True
+    except Exception as e:
+        logger.error("Error processing document %s: %s", document_path, e)
+        raise e
+
+
+def initialize_knowledge_base_manager() -> KnowledgeBaseManager:
     """Initialize knowledge base manager."""
     try:
         weaviate_url = get_weaviate_url_from_file() or "http://localhost:8080"
@@ -348,7 +1336,7 @@ def initialize_knowledge_base_manager():
         raise e
 
 
-def load_email_assistant_config(config: str) -> Dict:
+def load_email_assistant_config(config: str) -> Dict[str, Any]:
     """ Load a JSON config file for the email assistant.
     The config file should contain the following fields:
     - whitelist: List[str]
@@ -357,12 +1345,24 @@ def load_email_assistant_config(config: str) -> Dict:
     - answer_patterns:
         - sender_email: str
         - answer_pattern: str
+    Whitelist and blacklist are returned as lowercased frozensets and the
+    answer_patterns keys are lowercased, so lookups by sender are O(1) and
+    case-insensitive. Each answer_pattern is replaced by its compiled
+    template (see compile_answer_pattern).
     """
     try:
         with open(config, 'r') as f:
-            config = json.load(f)
+            config_data = json.load(f)
+        config_data["whitelist"] = normalize_address_list(config_data.get("whitelist"))
+        config_data["blacklist"] = normalize_address_list(config_data.get("blacklist"))
+        config_data["answer_patterns"] = {
+            sender_email.lower(): answer_config
+            for sender_email, answer_config in (config_data.get("answer_patterns") or {}).items()
+        }
+        for answer_config in config_data["answer_patterns"].values():
+            answer_config["answer_pattern"] = compile_answer_pattern(answer_config["answer_pattern"])
         logger.info("Email assistant config loaded")
-        return config
+        return config_data
     except Exception as e:
         logger.error(f"Error loading email assistant config: {e}")
         raise e
@@ -426,8 +1426,8 @@ def check_new_emails(
     kbm: KnowledgeBaseManager, 
     collection: str = "Email",
     limit: int = 5,
-    whitelist: List[str] = None,
-    blacklist: List[str] = None,
+    whitelist: Optional[FrozenSet[str]] = None,
+    blacklist: Optional[FrozenSet[str]] = None,
 ) -> List[EmailMessageModel]:
     """ Check for new emails in the email profile.
     """
@@ -436,13 +1436,7 @@ def check_new_emails(
     try:
         new_emails = kbm.check_new_emails(email_profile, limit=limit, include_body=True)
 
-        filtered_emails = []
-        if whitelist is None and blacklist is None:
-            filtered_emails = new_emails.emails
-        elif whitelist is not None:
-            filtered_emails = [email_msg for email_msg in new_emails.emails if email_msg.sender.email in whitelist]
-        else:  # only blacklist is not None
-            filtered_emails = [email_msg for email_msg in new_emails.emails if email_msg.sender.email not in blacklist]
+        filtered_emails = filter_emails_by_sender(new_emails.emails, whitelist, blacklist)
 
         if len(filtered_emails) != 0:
             fildered_email_ids = [email_msg.message_id for email_msg in filtered_emails]
@@ -457,52 +1451,55 @@ def check_new_emails(
             logger.info("No new emails found")
             return []
     except Exception as e:
-        logger.error(f"Error checking new emails: {e}")
+        logger.error("Error checking new emails: %s", e)
         raise e
 
 
 def get_answer_for_email(
     email_profile: EmailProvider,
     kbm: KnowledgeBaseManager,
-    email_assistant_config: Dict,
+    email_assistant_config: Dict[str, Any],
     email_message: EmailMessageModel,
     collection: str = "Email",
-) -> str:
+) -> Optional[str]:
     """ Answer an email using the email assistant config.
     """
     try:
 
         # Check if email_assistant_config contains the sentder email
-        if email_assistant_config["answer_patterns"].get(email_message.sender.email, None) is not None:
-            answer_pattern = email_assistant_config["answer_patterns"][email_message.sender.email]["answer_pattern"]
+        if email_assistant_config["answer_patterns"].get(email_message.sender.email.lower(), None) is not None:
+            answer_template = email_assistant_config["answer_patterns"][email_message.sender.email.lower()]["answer_pattern"]
         else:  # use the default answer pattern
-            answer_pattern = "Hello {sender.email}, I am the email assistant. I have found the following information for your question: {context_results}"
+            answer_template = _DEFAULT_ANSWER_TEMPLATE
         # search the knowledge base for the email message
-        email_body = EmailPreprocessor().clean_email_body(email_message)
-        context_results = kbm.search(email_body, collection=collection, strategy=SearchStrategy.HYBRID, top_k=3)
+        email_body = _EMAIL_PREPROCESSOR.clean_email_body(email_message)
+        # The retriever drops hits below the threshold before building results
+        context_results = kbm.search(
+            email_body,
+            collection=collection,
+            strategy=SearchStrategy.HYBRID,
+            top_k=CONTEXT_TOP_K,
+            score_threshold=CONTEXT_SCORE_THRESHOLD,
+        )
 
-        if len(context_results.results) == 0:
-            logger.info("No relevant context found for the email message, ID: {}, Subject: {}".format(email_message.message_id, email_message.subject))
-            return None
-        else:
-            # Check the confidence score of the context results
-            context_result_confident = ""
-            for context_result in context_results.results:
-                if context_result.similarity_score > 0.5:
-                    context_result_confident += context_result.content + "\n"
-            # find the answer pattern for the email message
-            if context_result_confident != "":
-                return answer_pattern.format(sender=email_message.sender.email, context_results=context_result_confident)
-            else:
-                logger.info("No answer pattern found for the email message, ID: {}, Subject: {}".format(email_message.message_id, email_message.subject))
+        # Hits below the score threshold were already dropped by the retriever
+        context_result_confident = "\n".join(
+            context_result.content for context_result in context_results.results if context_result.content
+        )
+        if context_result_confident == "":
+            logger.info("No relevant context found for the email message, ID: %s, Subject: %s", email_message.message_id, email_message.subject)
             return None
+        return answer_template({"sender": email_message.sender.email, "context_results": context_result_confident})
     except Exception as e:
-        logger.error(f"Error answering email: {e}")
+        logger.error("Error answering email: %s", e)
         raise e
 
 
-def email_assistant_workflow():
+def email_assistant_workflow() -> None:
     """Email assistant workflow."""
+    email_profile: Optional[BatchedIMAPProvider] = None
+    kbm: Optional[KnowledgeBaseManager] = None
+    idle_profile: Optional[BatchedIMAPProvider] = None
     try:
         email_profile = initialize_email_profile()
         kbm = initialize_knowledge_base_manager()
@@ -511,33 +1508,51 @@ def email_assistant_workflow():
         email_assistant_config = load_email_assistant_config("email_assistant_config.json")
         if "Email" not in collections:
             email_database_creation(email_profile, kbm, whitelist=email_assistant_config["whitelist"])
-            kbm.process_document("latex_documents/vahid.tex", collection="Email")
-            kbm.process_document("latex_documents/mohamed.tex", collection="Email")
-
-        while True:
-            logger.info("Checking for new emails at {time}".format(time=time.strftime("%Y-%m-%d %H:%M:%S")))
-            new_emails = check_new_emails(email_profile, kbm, collection="Email", limit=5, whitelist=email_assistant_config["whitelist"], blacklist=email_assistant_config["blacklist"])
-            for email_message in new_emails:
-                answer = get_answer_for_email(email_profile, kbm, email_assistant_config, email_message, collection="Email")
-                logger.info(f"Answer for email: {email_message.message_id} is prepared, sender: {email_message.sender}, subject: {email_message.subject}, answer: {answer}")
-                if answer is not None:
-                    if email_assistant_config["answer_patterns"].get(email_message.sender.email, None) is not None and email_assistant_config["answer_patterns"][email_message.sender.email]["answer_type"] == "draft":
-                        draft = draft_answer_for_email(email_profile, email_message, answer)
-                        logger.info(f"Drafted answer for email: {email_message.message_id}, draft ID: {draft.draft_id}")
-                    else:
-                        send_answer_to_email(email_profile, email_message, answer)
-                        logger.info(f"Sent answer to email: {email_message.message_id}")
-            # wait for 2 minutes, but allow quitting with 'q'
-            if wait_with_quit(120):
-                logger.info("Quit requested by user. Exiting.")
-                break
-            continue
+            # Fingerprints of an earlier Email collection don't describe the new one
+            clear_document_fingerprints(kbm, "Email")
+        for latex_file in LATEX_DOCUMENTS:
+            process_document_if_changed(kbm, latex_file, collection="Email")
+        enable_vector_quantization(kbm, collection="Email")
+
+        # Get pushed new-mail notifications via IMAP IDLE on a dedicated session,
+        # keeping the main session free for fetching and drafting
+        idle_profile = BatchedIMAPProvider(email_profile.credentials)
+        try:
+            idle_profile.connect(imap_only=True)
+            idle_profile.select_folder()
+        except Exception as e:
+            logger.warning("IMAP IDLE unavailable, polling instead: %s", e)
+            idle_profile = None
+
+        with cbreak_stdin():
+            while True:
+                logger.info("Checking for new emails")
+                new_emails: List[EmailMessageModel] = check_new_emails(email_profile, kbm, collection="Email", limit=5, whitelist=email_assistant_config["whitelist"], blacklist=email_assistant_config["blacklist"])
+                for email_message in new_emails:
+                    answer: Optional[str] = get_answer_for_email(email_profile, kbm, email_assistant_config, email_message, collection="Email")
+                    logger.info("Answer for email: %s is prepared, sender: %s, subject: %s, answer: %s", email_message.message_id, email_message.sender, email_message.subject, answer)
+                    if answer is not None:
+                        if email_assistant_config["answer_patterns"].get(email_message.sender.email.lower(), None) is not None and email_assistant_config["answer_patterns"][email_message.sender.email.lower()]["answer_type"] == "draft":
+                            draft = draft_answer_for_email(email_profile, email_message, answer)
+                            logger.info("Drafted answer for email: %s, draft ID: %s", email_message.message_id, draft.draft_id)
+                        else:
+                            send_answer_to_email(email_profile, email_message, answer)
+                            logger.info("Sent answer to email: %s", email_message.message_id)
+                # wait for new mail (polling every 2 minutes as a fallback), but allow quitting with 'q'
+                if wait_with_quit(120, idle_provider=idle_profile):
+                    logger.info("Quit requested by user. Exiting.")
+                    break
+                continue
     except Exception as e:
-        logger.error(f"Error: {e}")
+        logger.error("Error: %s", e)
         raise e
     finally:
-        email_profile.disconnect()
-        kbm.close()
+        if idle_profile is not None:
+            idle_profile.disconnect()
+        if email_profile is not None:
+            email_profile.disconnect()
+        if kbm is not None:
+            kbm.close()
         logger.info("Disconnected from email servers")
 
 